@@ -0,0 +1,177 @@
+"""API benchmark: time the hot endpoints against a seeded synthetic database.
+
+Builds a fresh SQLite database with bench/datagen.py, then requests each
+case through the Flask test client. The response cache is off unless
+--cache is given, so timings measure the queries. Prints JSON with p50/p95/mean
+latency and SQL statement counts per case. --compare prints the change
+against an earlier result file, so runs from two commits can be diffed.
+
+    python bench/api.py --habits 12 --years 2 -o before.json
+    python bench/api.py --habits 12 --years 2 --compare before.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import event  # noqa: E402
+
+import app as appmod  # noqa: E402
+import datagen  # noqa: E402
+
+def read_cases(today, tag):
+    month = today.strftime('%Y-%m')
+    month_start = today.replace(day=1).isoformat()
+    cases = [
+        ('data.day', f'/api/data?date={today.isoformat()}'),
+        ('data.month', f'/api/data?start={month_start}&end={today.isoformat()}'),
+        ('sync.full', '/api/sync'),
+        ('activity.month', f'/api/activity?month={month}'),
+        ('reports.week', '/api/reports?period=week'),
+        ('reports.month', '/api/reports?period=month'),
+        ('reports.year', '/api/reports?period=year'),
+        ('reports.week.tag', f'/api/reports?period=week&tag={tag}'),
+        ('reports.month.tag', f'/api/reports?period=month&tag={tag}'),
+        ('reports.year.tag', f'/api/reports?period=year&tag={tag}'),
+        ('reports.year.tags.any', f'/api/reports?period=year&tag={tag},{tag.upper()}x,mind'),
+        ('reports.year.tags.all', f'/api/reports?period=year&tag={tag},mind&tag_mode=all'),
+        ('reports.year.rows', '/api/reports/rows?period=year'),
+        ('reports.year.rows.rating', '/api/reports/rows?period=year&sort=rating&limit=500'),
+        ('goals.month', f'/api/goals?month={month}'),
+        ('media.search', '/api/media/search?q=coffee+walk'),
+        ('media.search.prefix', '/api/media/search?q=gard&sort=date'),
+        ('analytics.year', '/api/analytics'),
+        ('export.csv.year', '/export/csv?period=year'),
+        ('export.csv.all', '/export/csv?period=all'),
+    ]
+    return [(name, 'GET', url, None) for name, url in cases]
+
+def write_cases(habits, today, iterations):
+    # Dates cycle through the past so toggles/sets hit both existing and new rows
+    checkbox = next(h for h in habits if h.kind == 'checkbox')
+    single = next(h for h in habits if h.kind == 'numeric' and not h.allow_multi)
+    multi = next(h for h in habits if h.kind == 'numeric' and h.allow_multi)
+    day = lambda i: (today - timedelta(days=i % 60)).isoformat()
+    return [
+        ('write.toggle', 'POST', '/api/toggle', lambda i: {'id': checkbox.id, 'date': day(i)}),
+        ('write.numeric.single', 'POST', '/api/numeric/set', lambda i: {'id': single.id, 'date': day(i), 'value': i % 7}),
+        ('write.numeric.multi', 'POST', '/api/numeric/set', lambda i: {'id': multi.id, 'date': day(i), 'value': 0.5}),
+        ('write.media.add', 'POST', '/api/media/add',
+         lambda i: {'date': day(i), 'text': f'bench {i}', 'category': 'note', 'rating': i % 6, 'tags': ['health']}),
+        ('write.batch.50', 'POST', '/api/batch',
+         lambda i: {'ops': [{'op': 'toggle', 'id': checkbox.id, 'date': day(i * 50 + k)} for k in range(50)]}),
+    ]
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))]
+
+def run_case(client, counter, method, url, body, iterations, warmup):
+    times, queries, status = [], [], None
+    for i in range(warmup + iterations):
+        counter[0] = 0
+        t0 = time.perf_counter()
+        if method == 'GET':
+            resp = client.get(url)
+        else:
+            resp = client.post(url, json=body(i))
+        resp.get_data()  # drain streamed responses inside the timing
+        elapsed = (time.perf_counter() - t0) * 1000
+        resp.close()
+        status = resp.status_code
+        if i >= warmup:
+            times.append(elapsed); queries.append(counter[0])
+    return {
+        'status': status,
+        'p50Ms': round(percentile(times, 0.5), 3),
+        'p95Ms': round(percentile(times, 0.95), 3),
+        'meanMs': round(statistics.fmean(times), 3),
+        'queries': max(queries),
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(result, baseline):
+    lines = []
+    for name, cur in result['results'].items():
+        old = baseline.get('results', {}).get(name)
+        if not old:
+            continue
+        ratio = cur['p50Ms'] / old['p50Ms'] if old['p50Ms'] else float('inf')
+        lines.append(f"{name:22} p50 {old['p50Ms']:9.2f} -> {cur['p50Ms']:9.2f} ms ({ratio:5.2f}x)  "
+                     f"queries {old['queries']} -> {cur['queries']}")
+    return '\n'.join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--habits', type=int, default=12)
+    parser.add_argument('--years', type=float, default=2)
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--cache', action='store_true', help='Leave the response cache on.')
+    parser.add_argument('--only', help='Comma-separated case name prefixes to run.')
+    parser.add_argument('-o', '--output', help='Write the JSON result here as well as to stdout.')
+    parser.add_argument('--compare', help='Earlier result file to print p50/query deltas against.')
+    args = parser.parse_args(argv)
+
+    tmp = tempfile.mkdtemp(prefix='habit-bench-')
+    app = appmod.create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(tmp, 'bench.db'),
+                             'RESPONSE_CACHE_ENABLED': args.cache})
+    appmod.init_db(app)
+    with app.app_context():
+        t0 = time.perf_counter()
+        account = datagen.generate(seed=args.seed, habits=args.habits, years=args.years)[0]
+        generate_s = time.perf_counter() - t0
+        habits = appmod.Habit.query.filter_by(user_id=account['id']).order_by(appmod.Habit.id).all()
+        counts = {m.__tablename__: m.query.count() for m in (appmod.Record, appmod.NumericEntry, appmod.MediaEntry)}
+        counter = [0]
+        event.listen(appmod.db.engine, 'before_cursor_execute', lambda *a: counter.__setitem__(0, counter[0] + 1))
+
+    client = app.test_client()
+    resp = client.post('/api/login', json={'email': account['email'], 'password': account['password']})
+    assert resp.status_code == 200, resp.data
+    today = date.today()
+    cases = read_cases(today, datagen.TAGS[0]) + write_cases(habits, today, args.iterations)
+    if args.only:
+        prefixes = tuple(p.strip() for p in args.only.split(','))
+        cases = [c for c in cases if c[0].startswith(prefixes)]
+
+    results = {}
+    for name, method, url, body in cases:
+        results[name] = run_case(client, counter, method, url, body, args.iterations, args.warmup)
+        print(f"{name:22} p50 {results[name]['p50Ms']:9.2f} ms  p95 {results[name]['p95Ms']:9.2f} ms  "
+              f"queries {results[name]['queries']}", file=sys.stderr)
+
+    result = {
+        'meta': {'commit': git_commit(), 'seed': args.seed, 'habits': args.habits, 'years': args.years,
+                 'iterations': args.iterations, 'cache': args.cache, 'rows': counts,
+                 'generateSeconds': round(generate_s, 2), 'python': sys.version.split()[0]},
+        'results': results,
+    }
+    out = json.dumps(result, indent=2)
+    print(out)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(out + '\n')
+    if args.compare:
+        with open(args.compare) as f:
+            print(compare(result, json.load(f)), file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""Seeded synthetic data for benchmarks.
+
+Builds users whose habits cycle through every kind the app stores
+differently (checkbox, numeric single value, numeric multi-entry), with
+`years` of history ending today, plus tagged journal entries. Rows are
+bulk-inserted and daily_rollup is rebuilt afterwards, so the database looks
+like one grown through the API. The same seed always gives the same data.
+"""
+import random
+from datetime import date, timedelta
+
+from sqlalchemy import insert
+
+import app as appmod
+
+HABIT_KINDS = (
+    {'kind': 'checkbox'},
+    {'kind': 'numeric', 'unit': 'km', 'daily_goal': 5.0},
+    {'kind': 'numeric', 'unit': 'l', 'allow_multi': True, 'daily_goal': 2.0},
+)
+TAGS = ('health', 'study', 'work', 'sport', 'mind', 'social')
+CATEGORIES = ('book', 'film', 'music', 'note', 'podcast')
+WORDS = ('morning', 'run', 'coffee', 'read', 'chapter', 'meeting', 'walk', 'family', 'sleep', 'tired',
+         'focus', 'garden', 'rain', 'friends', 'cooking', 'project', 'music', 'calm', 'travel', 'gym')
+PASSWORD = 'bench-password'
+
+def generate(seed=1, users=1, habits=12, years=2, done_rate=0.6, journal_rate=0.4, entries_per_day=3, end=None):
+    """Insert the dataset into the current app's database; returns [{'id', 'email', 'password'}]."""
+    db = appmod.db
+    rnd = random.Random(seed)
+    words = random.Random(f'{seed}-words')  # separate stream, so journal text doesn't shift the rest of the data
+    end = end or date.today()
+    days = [end - timedelta(days=i) for i in range(int(years * 365))]
+    password_hash = appmod.generate_password_hash(PASSWORD)  # hashing once keeps generation fast
+    accounts = []
+    for u in range(users):
+        email = f'bench{seed}-{u}@example.com'
+        user = appmod.User(email=email, password_hash=password_hash)
+        db.session.add(user); db.session.flush()
+        tags = [appmod.Tag(user_id=user.id, name=name) for name in TAGS]
+        db.session.add_all(tags); db.session.flush()
+
+        habit_tags, records, entries = [], [], []
+        for i in range(habits):
+            spec = HABIT_KINDS[i % len(HABIT_KINDS)]
+            h = appmod.Habit(user_id=user.id, name=f'Habit {i + 1}', monthly_goal=rnd.choice((None, 10, 20)), **spec)
+            db.session.add(h); db.session.flush()
+            habit_tags += [{'habit_id': h.id, 'tag_id': t.id} for t in rnd.sample(tags, rnd.randint(0, 2))]
+            for d in days:
+                if rnd.random() >= done_rate:
+                    continue
+                day = d.isoformat()
+                if spec['kind'] == 'checkbox':
+                    records.append({'habit_id': h.id, 'date': day, 'done': True, 'value': None})
+                elif spec.get('allow_multi'):
+                    entries += [{'habit_id': h.id, 'date': day, 'value': round(rnd.uniform(0.1, 1.0), 2)}
+                                for _ in range(rnd.randint(1, entries_per_day))]
+                else:
+                    value = round(rnd.uniform(0, 10), 1)
+                    records.append({'habit_id': h.id, 'date': day, 'done': value > 0, 'value': value})
+
+        media, media_tags = [], []
+        for d in days:
+            if rnd.random() < journal_rate:
+                media.append(appmod.MediaEntry(user_id=user.id, date=d.isoformat(), checked=rnd.random() < 0.5,
+                                               text=f"Entry {len(media) + 1}: {' '.join(words.choices(WORDS, k=12))}", category=rnd.choice(CATEGORIES),
+                                               rating=rnd.choice((None, 1, 2, 3, 4, 5))))
+        db.session.add_all(media); db.session.flush()
+        for m in media:
+            media_tags += [{'media_entry_id': m.id, 'tag_id': t.id} for t in rnd.sample(tags, rnd.randint(0, 2))]
+
+        for model, rows in ((appmod.HabitTag, habit_tags), (appmod.Record, records),
+                            (appmod.NumericEntry, entries), (appmod.MediaEntryTag, media_tags)):
+            if rows:
+                db.session.execute(insert(model), rows)
+        appmod.rebuild_rollup(user.id)  # commits
+        accounts.append({'id': user.id, 'email': email, 'password': PASSWORD})
+    return accounts
@@ -0,0 +1,53 @@
+"""Startup benchmark: time `import app` + `create_app()` in fresh interpreters.
+
+Each run is a new process, like a worker fork or test run. Framework imports
+(Flask, SQLAlchemy, Flask-Login) are timed separately, so the budget only
+covers what this project adds on top of them. Exits 1 when the median of
+the app's own share exceeds --budget-ms.
+
+    python bench/startup.py --runs 15 --budget-ms 150
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r'''
+import json, time
+t0 = time.perf_counter()
+import flask, flask_login, flask_sqlalchemy, sqlalchemy
+t1 = time.perf_counter()
+import app
+t2 = time.perf_counter()
+app.create_app()
+t3 = time.perf_counter()
+print(json.dumps({'frameworkMs': (t1 - t0) * 1000, 'importMs': (t2 - t1) * 1000, 'createAppMs': (t3 - t2) * 1000}))
+'''
+
+def run_once():
+    out = subprocess.run([sys.executable, '-c', CHILD], cwd=ROOT, check=True,
+                         capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=11)
+    parser.add_argument('--budget-ms', type=float, default=float(os.environ.get('STARTUP_BUDGET_MS', 150)),
+                        help='Maximum median of import app + create_app(), excluding framework imports.')
+    args = parser.parse_args(argv)
+
+    samples = [run_once() for _ in range(args.runs)]
+    result = {k: round(statistics.median(s[k] for s in samples), 1) for k in samples[0]}
+    result['appMs'] = round(statistics.median(s['importMs'] + s['createAppMs'] for s in samples), 1)
+    result['budgetMs'] = args.budget_ms
+    result['runs'] = args.runs
+    result['ok'] = result['appMs'] <= args.budget_ms
+    print(json.dumps(result, indent=2))
+    return 0 if result['ok'] else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -9,6 +9,7 @@ const state = {
   selectedDay: new Date().toISOString().slice(0,10),
   habits: [],
   activity: {},
+  cursor: null,
   selectedHabitId: null,
   currentHabitAction: null
 };
@@ -36,11 +37,37 @@ async function setSelectedDay(dayStr) {
 }
 
 async function fetchData(){
-  const res = await fetch('/api/data'); const data = await res.json(); state.habits = data.habits || [];
+  const res = await fetch('/api/data?date='+state.selectedDay); const data = await res.json(); state.habits = data.habits || [];
+  state.cursor = data.cursor;
+  await fetchActivity();
+}
+
+async function fetchActivity(){
   const monthStr = yyyymm(state.month);
   const a = await fetch('/api/activity?month='+monthStr); const j = await a.json(); state.activity = j.dateCounts || {};
 }
 
+// Apply only what changed since the last load instead of re-downloading /api/data
+async function syncData(){
+  if(state.cursor == null) return fetchData();
+  const res = await fetch('/api/sync?since='+state.cursor); const d = await res.json();
+  if(d.full) return fetchData();
+  for(const h of d.habits){
+    const cur = getHabitById(h.id);
+    if(!h.active){ state.habits = state.habits.filter(x=>x.id!==h.id); }
+    else if(cur){ Object.assign(cur, h); }
+    else{ state.habits.push({...h, records: {}}); }
+  }
+  const gone = new Set(d.deleted.habits);
+  state.habits = state.habits.filter(h=>!gone.has(h.id));
+  for(const day of d.days){
+    const h = getHabitById(day.habitId); if(!h) continue;
+    if(day.value === null) delete h.records[day.date]; else h.records[day.date] = day.value;
+  }
+  state.cursor = d.cursor;
+  await fetchActivity();
+}
+
 function renderCalendar(){
   el('monthLabel').textContent = state.month.toLocaleString(undefined,{month:'long', year:'numeric'});
   const cont = el('calendar'); const first = new Date(state.month.getFullYear(), state.month.getMonth(), 1);
@@ -233,7 +260,7 @@ async function refreshDay(){
 
 /* ---------- Page lifecycle ---------- */
 async function loadAndRender(){
-  await fetchData();
+  await syncData();
   renderCalendar();
   populateHabitPicker();
   renderSelectedHabitCard();
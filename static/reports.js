@@ -34,28 +34,6 @@ async function runReport() {
   //  document.getElementById('repMeta').textContent += ` • Tag filter: "${tag}"`;
   //}
 
-const repTableBody = document.querySelector('#repTable tbody');
-repTableBody.innerHTML = ''; // clear old rows
-
-for (const row of data.rows) {
-  if (row.type !== 'habit') continue;
-  const tr = document.createElement('tr');
-  const tags = (row.tags || []).join(', ');
-  console.log("*********")
-  console.log(row);
-  console.log(tags);
-  console.log("*********")
-  tr.innerHTML = `
-    <td>${row.date}</td>
-    <td>${row.habit}</td>
-    <td>${row.kind}</td>
-    <td>${row.done}</td>
-    <td>${tags}</td>
-  `;
-  repTableBody.appendChild(tr);
-}
-
-
   // Build a tag map per habit from data.rows
 //  const habitTagMap = {};
 //  rowTags = [];
@@ -96,7 +74,7 @@ for (const row of data.rows) {
       goal: '',
       doneCount: '',
       percent: '',
-      tags: habitTagMap[row.habit] || []
+      tags: row.tags || []
     };
   }
 
@@ -157,11 +135,26 @@ for (const row of data.rows) {
     hbody.appendChild(tr);
   }
 
-  // Journal Rows Table
+  // Journal Rows Table (paged from /api/reports/rows)
+  loadRows(true);
+}
+
+let rowsCursor = null;
+
+async function loadRows(reset) {
   const tbody = document.querySelector('#repTable tbody');
-  tbody.innerHTML = '';
-  for (const row of data.rows) {
-    if (row.type !== 'journal') continue;
+  const more = document.getElementById('repMore');
+  const url = new URL('/api/reports/rows', location.origin);
+  url.searchParams.set('period', document.getElementById('repPeriod').value);
+  url.searchParams.set('start', document.getElementById('repStart').value);
+  url.searchParams.set('sort', document.getElementById('repSort').value);
+  url.searchParams.set('type', 'journal');
+  if (!reset && rowsCursor) url.searchParams.set('cursor', rowsCursor);
+
+  const r = await fetch(url.toString());
+  const data = await r.json();
+  if (reset) tbody.innerHTML = '';
+  for (const row of (data.rows || [])) {
     const tr = document.createElement('tr');
     const tags = (row.tags || []).join(', ');
     tr.innerHTML = `
@@ -176,6 +169,8 @@ for (const row of data.rows) {
     `;
     tbody.appendChild(tr);
   }
+  rowsCursor = data.nextCursor || null;
+  if (more) more.hidden = !rowsCursor;
 }
 
 // Legacy — no longer used (safe to remove or keep for now)
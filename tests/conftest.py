@@ -0,0 +1,100 @@
+"""Fixtures shared by the test suite.
+
+Every test that takes ``app`` or ``client`` runs once per backend: SQLite
+(a temporary file) and PostgreSQL (a fresh database per test). The
+PostgreSQL server is TEST_POSTGRESQL_URL when set; otherwise a throwaway
+local one is started with pgserver (pip install -r requirements-dev.txt).
+Without either, the postgresql runs are skipped.
+
+    python -m pytest -q
+    TEST_POSTGRESQL_URL=postgresql://postgres@localhost/postgres python -m pytest -q
+"""
+import os
+import sys
+import uuid
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import app as appmod  # noqa: E402
+
+TEST_CONFIG = {
+    'TESTING': True,
+    'PASSWORD_HASH_WORKERS': 0,  # inline: no process pool per test
+    'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000',
+}
+
+@pytest.fixture(scope='session')
+def postgresql_url(tmp_path_factory):
+    url = os.environ.get('TEST_POSTGRESQL_URL')
+    if url:
+        yield url
+        return
+    try:
+        import pgserver
+    except ImportError:
+        pytest.skip('set TEST_POSTGRESQL_URL or install pgserver to run against PostgreSQL')
+    server = pgserver.get_server(str(tmp_path_factory.mktemp('pgdata')), cleanup_mode='stop')
+    yield server.get_uri()
+    server.cleanup()
+
+@pytest.fixture(params=['sqlite', 'postgresql'])
+def database_url(request, tmp_path):
+    """DATABASE_URL of an empty database on each backend."""
+    if request.param == 'sqlite':
+        yield f"sqlite:///{tmp_path / 'test.db'}"
+        return
+    server = make_url(request.getfixturevalue('postgresql_url'))
+    name = f'habits_test_{uuid.uuid4().hex[:12]}'
+    admin = create_engine(server, isolation_level='AUTOCOMMIT')
+    with admin.connect() as conn:
+        conn.exec_driver_sql(f'CREATE DATABASE {name}')
+    yield server.set(database=name).render_as_string(hide_password=False)
+    with admin.connect() as conn:
+        conn.exec_driver_sql(f'DROP DATABASE IF EXISTS {name} WITH (FORCE)')
+    admin.dispose()
+
+@pytest.fixture
+def app(database_url):
+    # Per-process stores are keyed by user id and data_version, which repeat across test databases
+    appmod.response_cache.backend = None
+    appmod.history_store.users.clear()
+    app = appmod.create_app(dict(TEST_CONFIG, SQLALCHEMY_DATABASE_URI=database_url))
+    appmod.init_db(app)
+    yield app
+    with app.app_context():
+        appmod.db.session.remove()
+        appmod.db.engine.dispose()
+
+@pytest.fixture
+def db(app):
+    with app.app_context():
+        yield appmod.db
+        appmod.db.session.remove()
+
+def login(app, email='a@example.com', password='pw'):
+    """Test client signed in as a newly registered user."""
+    client = app.test_client()
+    client.post('/register', data={'email': email, 'password': password})
+    resp = client.post('/api/login', json={'email': email, 'password': password})
+    assert resp.status_code == 200, resp.get_json()
+    return client
+
+@pytest.fixture
+def client(app):
+    return login(app)
+
+def add_habit(client, **fields):
+    resp = client.post('/api/habits/add', json=dict({'name': 'Run', 'kind': 'checkbox'}, **fields))
+    assert resp.status_code == 200, resp.get_json()
+    return resp.get_json()['id']
+
+def rollup_rows():
+    return sorted(tuple(r) for r in appmod.db.session.query(
+        appmod.DailyRollup.user_id, appmod.DailyRollup.habit_id, appmod.DailyRollup.date,
+        appmod.DailyRollup.has_record, appmod.DailyRollup.done, appmod.DailyRollup.value,
+        appmod.DailyRollup.entry_count, appmod.DailyRollup.entry_total))
@@ -0,0 +1,82 @@
+from datetime import date
+
+import pytest
+
+from conftest import add_habit
+
+RANGE = {'start': '2024-03-01', 'end': '2024-03-10'}  # Friday to Sunday
+
+@pytest.fixture
+def habits(client):
+    ids = {
+        'run': add_habit(client, name='Run'),
+        'water': add_habit(client, name='Water', kind='numeric', dailyGoal=2),
+        'idle': add_habit(client, name='Idle'),
+    }
+    # 2024-02-29 is before the range: it only counts toward the trailing windows
+    for d in ('2024-02-29', '2024-03-01', '2024-03-02', '2024-03-03', '2024-03-05', '2024-03-10'):
+        client.post('/api/toggle', json={'id': ids['run'], 'date': d})
+    for d, v in (('2024-02-20', 4), ('2024-03-01', 1), ('2024-03-02', 3), ('2024-03-09', 0)):
+        client.post('/api/numeric/set', json={'id': ids['water'], 'date': d, 'value': v})
+    client.post('/api/habits/active', json={'id': ids['idle'], 'active': False})
+    return ids
+
+def analytics(client, **args):
+    resp = client.get('/api/analytics', query_string=dict(RANGE, **args))
+    assert resp.status_code == 200, resp.get_json()
+    return {h['habit']: h for h in resp.get_json()['habits']}
+
+def test_checkbox_rates_runs_and_weekdays(client, habits):
+    run = analytics(client)['Run']
+    assert (run['doneDays'], run['completionRate']) == (5, 0.5)
+    assert run['rolling'] == {'7': round(2 / 7, 4), '30': 0.2, '90': round(6 / 90, 4)}
+    assert run['runs'] == [{'start': '2024-03-01', 'end': '2024-03-03', 'length': 3},
+                           {'start': '2024-03-05', 'end': '2024-03-05', 'length': 1},
+                           {'start': '2024-03-10', 'end': '2024-03-10', 'length': 1}]
+    assert (run['longestRun'], run['currentRun']) == (3, 1)
+    # Monday first; Friday to Sunday occur twice in the range
+    assert run['weekdays'] == [0.0, 1.0, 0.0, 0.0, 0.5, 0.5, 1.0]
+    assert 'numeric' not in run
+
+def test_numeric_moving_averages_against_goal(client, habits):
+    water = analytics(client)['Water']
+    assert water['doneDays'] == 2  # a logged 0 is not done
+    assert water['numeric'] == {
+        'dailyGoal': 2.0,
+        'loggedDays': 3,
+        'mean': round(4 / 3, 4),
+        'movingAverage': {'7': 0.0, '30': 2.0},  # the 30-day window reaches 02-20
+        'goalRatio': {'7': 0.0, '30': 1.0},
+        'goalHitRate': round(1 / 3, 4),
+    }
+
+def test_series_has_one_value_per_day(client, habits):
+    data = analytics(client, series='1')
+    run, water = data['Run']['series'], data['Water']['series']
+    assert all(len(v) == 10 for v in run['rolling'].values())
+    assert run['rolling']['7'][0] == round(2 / 7, 4)  # 02-29 and 03-01
+    assert run['rolling']['7'][-1] == data['Run']['rolling']['7']
+    assert 'movingAverage' not in run
+    assert water['movingAverage']['7'][:3] == [1.0, 2.0, 2.0]
+    assert 'series' not in analytics(client)['Run']
+
+def test_inactive_habits_only_by_id(client, habits):
+    assert set(analytics(client)) == {'Run', 'Water'}
+    assert set(analytics(client, ids=f"{habits['idle']},{habits['water']}")) == {'Idle', 'Water'}
+    idle = analytics(client, ids=str(habits['idle']))['Idle']
+    assert (idle['doneDays'], idle['runs'], idle['currentRun'], idle['rolling']['7']) == (0, [], 0, 0.0)
+
+def test_default_range_is_last_year(client):
+    add_habit(client)
+    data = client.get('/api/analytics?series=1').get_json()
+    assert data['end'] == date.today().isoformat()
+    assert len(data['habits'][0]['series']['rolling']['7']) == 365
+
+@pytest.mark.parametrize('query', [
+    '?start=2024-03-10&end=2024-03-01',
+    '?start=2024-02-30&end=2024-03-01',
+    '?start=2014-01-01&end=2024-01-02',  # 3653 days
+    '?ids=1,x',
+])
+def test_invalid_parameters(client, query):
+    assert client.get('/api/analytics' + query).status_code == 400
@@ -0,0 +1,88 @@
+import pytest
+
+import app as appmod
+from conftest import add_habit, login
+
+def test_memory_backend_evicts_least_recently_used(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(appmod.time, 'monotonic', lambda: now[0])
+    cache = appmod.MemoryCacheBackend(max_entries=2)
+    cache.set('a', b'1', ttl=10); cache.set('b', b'2', ttl=10)
+    assert cache.get('a') == b'1'  # 'b' is now the oldest
+    cache.set('c', b'3', ttl=10)
+    assert (cache.get('a'), cache.get('b'), cache.get('c'), cache.evictions) == (b'1', None, b'3', 1)
+    now[0] += 11
+    assert cache.get('a') is None and 'a' not in cache.entries
+
+def test_backends_must_implement_get_and_set():
+    class Incomplete(appmod.CacheBackend):
+        def get(self, key):
+            return None
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_responses_are_cached_until_the_next_write(client):
+    hid = add_habit(client)
+    first = client.get('/api/data')
+    assert first.headers['X-Cache'] == 'MISS'
+    again = client.get('/api/data')
+    assert again.headers['X-Cache'] == 'HIT' and again.get_json() == first.get_json()
+    client.post('/api/toggle', json={'id': hid, 'date': '2024-01-01'})
+    fresh = client.get('/api/data')
+    assert fresh.headers['X-Cache'] == 'MISS' and fresh.get_json()['habits'][0]['records'] == {'2024-01-01': True}
+    assert client.get('/api/cache/stats').get_json()['hits'] >= 1
+
+def test_cache_is_per_user(app, client):
+    add_habit(client, name='Mine')
+    assert client.get('/api/data').headers['X-Cache'] == 'MISS'
+    other = login(app, email='b@example.com')
+    resp = other.get('/api/data')
+    assert resp.headers['X-Cache'] == 'MISS' and resp.get_json()['habits'] == []
+
+def test_custom_backend(client, monkeypatch):
+    class DictBackend(appmod.CacheBackend):
+        def __init__(self):
+            self.store = {}
+        def get(self, key):
+            return self.store.get(key)
+        def set(self, key, value, ttl):
+            self.store[key] = value
+    backend = DictBackend()
+    monkeypatch.setattr(appmod.response_cache, 'backend', backend)
+    client.get('/api/reports?period=week')
+    assert client.get('/api/reports?period=week').headers['X-Cache'] == 'HIT'
+    assert len(backend.store) == 1
+
+def test_cache_can_be_disabled(app, client):
+    app.config['RESPONSE_CACHE_ENABLED'] = False
+    client.get('/api/data')
+    assert 'X-Cache' not in client.get('/api/data').headers
+
+def test_etag_revalidation(client, monkeypatch):
+    hid = add_habit(client)
+    first = client.get('/api/data')
+    etag = first.headers['ETag']
+    assert first.headers['Cache-Control'] == 'private, no-cache'
+
+    def not_called(*args, **kwargs):
+        raise AssertionError('view ran for a matching If-None-Match')
+    monkeypatch.setattr(appmod, 'load_habit_snapshot', not_called)
+    resp = client.get('/api/data', headers={'If-None-Match': etag})
+    assert resp.status_code == 304 and resp.data == b'' and resp.headers['ETag'] == etag
+    monkeypatch.undo()
+
+    client.post('/api/toggle', json={'id': hid, 'date': '2024-01-01'})
+    resp = client.get('/api/data', headers={'If-None-Match': etag})
+    assert resp.status_code == 200 and resp.headers['ETag'] != etag
+
+def test_etag_depends_on_view_arguments_and_user(app, client):
+    a = client.get('/api/reports?period=month&tag=x').headers['ETag']
+    assert client.get('/api/reports?tag=x&period=month').headers['ETag'] == a
+    assert client.get('/api/reports?period=week&tag=x').headers['ETag'] != a
+    other = login(app, email='b@example.com')
+    resp = other.get('/api/reports?period=month&tag=x', headers={'If-None-Match': a})
+    assert resp.status_code == 200 and resp.headers['ETag'] != a
+
+def test_errors_carry_no_etag(client):
+    resp = client.get('/api/reports?tag_mode=some')
+    assert resp.status_code == 400 and 'ETag' not in resp.headers
@@ -0,0 +1,102 @@
+import csv
+import io
+
+import pytest
+
+import app as appmod
+from conftest import add_habit, login, rollup_rows
+
+@pytest.fixture
+def history(client):
+    run = add_habit(client, name='Run', tags=['health'], monthlyGoal=3)
+    water = add_habit(client, name='Water', kind='numeric', allowMulti=True, unit='l')
+    for d in ('2024-03-01', '2024-03-02', '2024-03-04'):
+        client.post('/api/toggle', json={'id': run, 'date': d})
+    for v in (0.5, 1.25):
+        client.post('/api/numeric/set', json={'id': water, 'date': '2024-03-02', 'value': v})
+    client.post('/api/media/add', json={'date': '2024-03-02', 'text': 'Walk, "long"', 'rating': 4,
+                                        'category': 'outdoor', 'tags': ['health', 'mood']})
+    return {'run': run, 'water': water}
+
+def user_state(client):
+    habits = client.get('/api/data').get_json()['habits']
+    habits = [{k: v for k, v in h.items() if k != 'id'} for h in habits]
+    report = client.get('/api/reports?period=month&start=2024-03-01').get_json()
+    goals = [{k: v for k, v in g.items() if k != 'habitId'} for g in report['goals']]
+    return habits, report['count'], report['summary'], goals
+
+def csv_rows(resp):
+    assert resp.status_code == 200 and resp.mimetype == 'text/csv'
+    return list(csv.DictReader(io.StringIO(resp.get_data(as_text=True))))
+
+def test_csv_export_all(client, history):
+    resp = client.get('/export/csv?period=all')
+    assert resp.is_streamed
+    assert resp.headers['Content-Disposition'] == 'attachment; filename=habit_export_all.csv'
+    rows = csv_rows(resp)
+    assert [(r['type'], r['date'], r['habit'] or r['text'], r['value']) for r in rows] == [
+        ('habit', '2024-03-01', 'Run', '0'),
+        ('habit', '2024-03-02', 'Run', '0'),
+        ('habit', '2024-03-02', 'Water', '1.75'),  # multi entries summed per day
+        ('journal', '2024-03-02', 'Walk, "long"', '4'),
+        ('habit', '2024-03-04', 'Run', '0'),
+    ]
+    assert rows[0]['tags'] == 'health' and rows[3]['tags'] == 'health,mood'
+    assert list(rows[0]) == appmod.EXPORT_COLS
+
+def test_csv_export_filters(client, history):
+    client.post('/api/toggle', json={'id': history['run'], 'date': '2024-03-04'})  # undone: not exported
+    rows = csv_rows(client.get('/export/csv?start=2024-03-02&end=2024-03-04'))
+    assert [(r['date'], r['habit'] or r['text']) for r in rows] == [
+        ('2024-03-02', 'Run'), ('2024-03-02', 'Water'), ('2024-03-02', 'Walk, "long"')]
+    rows = csv_rows(client.get('/export/csv?period=month&start=2024-03-15&tag=mood'))
+    assert [r['type'] for r in rows] == ['journal']
+    assert client.get('/export/csv?end=2024-02-30').status_code == 400
+
+def test_csv_export_streams_in_chunks(client, history, monkeypatch):
+    whole = client.get('/export/csv?period=all').get_data(as_text=True)
+    monkeypatch.setattr(appmod, 'EXPORT_BATCH', 2)
+    resp = client.get('/export/csv?period=all')
+    chunks = [c for c in resp.response]
+    assert len(chunks) == 3 and b''.join(c if isinstance(c, bytes) else c.encode() for c in chunks).decode() == whole
+
+def test_columnar_round_trip(app, client, history):
+    blob = client.get('/export/columnar')
+    assert blob.status_code == 200 and blob.data.startswith(appmod.COLUMNAR_MAGIC)
+    other = login(app, email='b@example.com')
+    resp = other.post('/import/columnar', data=blob.data, content_type='application/octet-stream')
+    assert resp.status_code == 200, resp.get_json()
+    assert resp.get_json()['imported']['record'] == 3
+    assert resp.get_json()['imported']['numeric_entry'] == 2
+    assert user_state(other) == user_state(client)
+    with app.app_context():
+        assert appmod.verify_streaks() == []
+
+def test_columnar_import_rejects_bad_files(app, client, history):
+    assert client.post('/import/columnar', data=b'not a file').status_code == 400
+    # One habit-tag link listed twice
+    tables = {'habit': [('id', 'int', [1]), ('name', 'str', ['Dup']), ('kind', 'str', ['checkbox']),
+                        ('color', 'str', ['#000000'])],
+              'tag': [('id', 'int', [5]), ('name', 'str', ['x'])],
+              'habit_tag': [('habit_id', 'int', [1, 1]), ('tag_id', 'int', [5, 5])]}
+    blob = appmod.encode_columnar(dict(tables, **{
+        'record': [('habit_id', 'int', []), ('date', 'day', []), ('done', 'bool', [])],
+        'numeric_entry': [('habit_id', 'int', []), ('date', 'day', []), ('value', 'float', [])],
+        'media_entry': [('id', 'int', []), ('date', 'day', []), ('text', 'str', [])],
+        'media_entry_tag': [('media_entry_id', 'int', []), ('tag_id', 'int', [])]}))
+    resp = client.post('/import/columnar', data=blob)
+    assert resp.status_code == 400 and 'conflicting' in resp.get_json()['error']
+    assert [h['name'] for h in client.get('/api/data').get_json()['habits']] == ['Run', 'Water']
+
+def test_columnar_import_is_one_transaction(app, client, history, monkeypatch):
+    blob = client.get('/export/columnar').data
+    other = login(app, email='b@example.com')
+    def broken(user_id):
+        raise RuntimeError('rollup rebuild failed')
+    monkeypatch.setattr(appmod, 'rebuild_streaks', broken)
+    with pytest.raises(RuntimeError):
+        other.post('/import/columnar', data=blob)
+    with app.app_context():
+        uid = appmod.User.query.filter_by(email='b@example.com').one().id
+        assert appmod.Habit.query.filter_by(user_id=uid).count() == 0
+        assert [r for r in rollup_rows() if r[0] == uid] == []
@@ -0,0 +1,47 @@
+import logging
+
+import pytest
+from sqlalchemy import text
+
+import app as appmod
+
+def test_metrics_count_requests(client):
+    client.get('/api/data')
+    body = client.get('/metrics').get_data(as_text=True)
+    assert 'http_request_duration_seconds_count{endpoint="habits.api_data",method="GET",status="200"}' in body
+    assert 'http_request_queries_count{endpoint="habits.api_data"}' in body
+    assert 'http_metrics_sample_rate 1.0' in body
+
+@pytest.mark.parametrize('environ, headers, status', [
+    ({'REMOTE_ADDR': '127.0.0.1'}, {}, 200),
+    ({'REMOTE_ADDR': '10.1.2.3'}, {}, 403),
+    ({'REMOTE_ADDR': '127.0.0.1'}, {'X-Forwarded-For': '10.1.2.3'}, 403),
+])
+def test_metrics_are_local_without_token(app, environ, headers, status):
+    assert app.test_client().get('/metrics', environ_base=environ, headers=headers).status_code == status
+
+def test_metrics_token(app):
+    app.config['METRICS_TOKEN'] = 'secret'
+    client = app.test_client()
+    assert client.get('/metrics').status_code == 401
+    resp = client.get('/metrics', headers={'Authorization': 'Bearer secret'}, environ_base={'REMOTE_ADDR': '10.1.2.3'})
+    assert resp.status_code == 200
+
+def test_failed_statement_does_not_skew_timings(db):
+    m = appmod.metrics.local.request = appmod.RequestMetrics(keep_sql=True)
+    try:
+        with pytest.raises(Exception):
+            db.session.execute(text('SELECT * FROM no_such_table'))
+        db.session.rollback()
+        assert 'metrics_query_start' not in db.session.connection().info
+        db.session.execute(text('SELECT 1'))
+        assert m.statements[-1][1] == 'SELECT 1' and m.statements[-1][0] >= 0
+    finally:
+        appmod.metrics.local.request = None
+
+def test_slow_request_log(app, client, caplog):
+    app.config['SLOW_REQUEST_MS'] = 0.001
+    with caplog.at_level(logging.WARNING):
+        client.get('/api/data')
+    slow = [r.getMessage() for r in caplog.records if r.getMessage().startswith('slow request')]
+    assert slow and 'GET /api/data (habits.api_data)' in slow[0] and 'SELECT' in slow[0]
@@ -0,0 +1,49 @@
+from datetime import date, timedelta
+
+from sqlalchemy import inspect
+
+import app as appmod
+from conftest import add_habit, rollup_rows
+
+def test_fresh_database_is_current(db):
+    assert appmod.schema_version() == appmod.MIGRATIONS[-1][0]
+    assert appmod.run_migrations() == []
+    tables = set(inspect(db.engine).get_table_names())
+    assert {'habit', 'record', 'daily_rollup', 'change_log', 'schema_version'} <= tables
+    assert 'txid' in {c['name'] for c in inspect(db.engine).get_columns('change_log')}
+
+def test_migrations_are_numbered_in_order():
+    versions = [v for v, _, _ in appmod.MIGRATIONS]
+    assert versions == list(range(1, len(versions) + 1))
+
+def test_replaying_every_step_keeps_data(app, client):
+    hid = add_habit(client, tags=['health'])
+    today = date.today()
+    for n in (0, 1, 3):
+        client.post('/api/toggle', json={'id': hid, 'date': (today - timedelta(days=n)).isoformat()})
+    client.post('/api/media/add', json={'date': today.isoformat(), 'text': 'walk', 'tags': ['health']})
+    before = client.get('/api/data').get_json()['habits']
+
+    with app.app_context():
+        rows = rollup_rows()
+        # A database that predates schema_version replays every step
+        appmod.SchemaVersion.query.delete()
+        appmod.db.session.commit()
+        applied = appmod.run_migrations()
+        assert [v for v, _, _ in applied] == [v for v, _, _ in appmod.MIGRATIONS]
+        assert rollup_rows() == rows
+        assert appmod.verify_streaks() == []
+
+    client.post('/api/toggle', json={'id': hid, 'date': (today - timedelta(days=2)).isoformat()})
+    after = client.get('/api/data').get_json()['habits']
+    assert after[0]['records'] == dict(before[0]['records'], **{(today - timedelta(days=2)).isoformat(): True})
+
+def test_writes_are_logged_for_sync(app, client):
+    hid = add_habit(client)
+    client.post('/api/toggle', json={'id': hid, 'date': '2024-01-31'})
+    with app.app_context():
+        logged = {(c.entity, c.entity_id, c.date, c.op) for c in appmod.ChangeLog.query}
+        assert ('habit', hid, None, 'upsert') in logged
+        assert ('day', hid, '2024-01-31', 'upsert') in logged
+        if appmod.db.engine.dialect.name == 'postgresql':
+            assert all(c.txid is not None for c in appmod.ChangeLog.query)
@@ -0,0 +1,87 @@
+import pytest
+
+import app as appmod
+from conftest import TEST_CONFIG, login
+
+CREDENTIALS = {'email': 'a@example.com', 'password': 'pw'}
+
+def stored_hash(app, email='a@example.com'):
+    with app.app_context():
+        return appmod.User.query.filter_by(email=email).one().password_hash
+
+@pytest.fixture
+def saturated(monkeypatch):
+    # One worker, no queue, and a call already in flight
+    hasher = appmod.password_hasher
+    monkeypatch.setattr(hasher, 'workers', 1)
+    monkeypatch.setattr(hasher, 'max_pending', 1)
+    monkeypatch.setattr(hasher, 'pending', 1)
+    return hasher
+
+def test_inline_hashing_uses_configured_method(app, client):
+    assert appmod.password_hasher.workers == 0
+    assert stored_hash(app).startswith('pbkdf2:sha256:1000$')
+
+def test_login_rehashes_on_method_change(app, client):
+    old = stored_hash(app)
+    app.config['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:2000'
+    appmod.password_hasher.init_app(app)
+    try:
+        assert app.test_client().post('/api/login', json=CREDENTIALS).status_code == 200
+        new = stored_hash(app)
+        assert new != old and new.startswith('pbkdf2:sha256:2000$')
+        assert app.test_client().post('/api/login', json=CREDENTIALS).status_code == 200
+        assert stored_hash(app) == new  # already current
+        resp = app.test_client().post('/api/login', json=dict(CREDENTIALS, password='nope'))
+        assert resp.status_code == 401
+    finally:
+        app.config['PASSWORD_HASH_METHOD'] = TEST_CONFIG['PASSWORD_HASH_METHOD']
+        appmod.password_hasher.init_app(app)
+
+def test_busy_rehash_still_logs_in(app, client, monkeypatch):
+    old = stored_hash(app)
+    monkeypatch.setattr(appmod.password_hasher, 'method', 'pbkdf2:sha256:2000')
+    def busy(password):
+        raise appmod.HashPoolBusy()
+    monkeypatch.setattr(appmod.password_hasher, 'hash', busy)
+    assert app.test_client().post('/api/login', json=CREDENTIALS).status_code == 200
+    assert stored_hash(app) == old
+
+def test_saturated_pool_rejects_json_with_503(app, client, saturated):
+    rejected = saturated.rejected
+    resp = app.test_client().post('/api/login', json=CREDENTIALS)
+    assert resp.status_code == 503 and resp.headers['Retry-After'] == '1'
+    assert resp.get_json()['ok'] is False
+    assert saturated.rejected == rejected + 1
+    body = client.get('/metrics').get_data(as_text=True)
+    assert f'password_hash_rejected_total {rejected + 1}' in body
+    assert 'password_hash_pending 1' in body and 'password_hash_workers 1' in body
+
+@pytest.mark.parametrize('path, email', [('/login', 'a@example.com'), ('/register', 'b@example.com')])
+def test_saturated_pool_redirects_forms(app, client, saturated, path, email):
+    resp = app.test_client().post(path, data={'email': email, 'password': 'pw'})
+    assert resp.status_code == 302 and resp.headers['Location'].endswith(path)
+    assert resp.headers['Retry-After'] == '1'
+
+def test_worker_pool_hashes_and_verifies(app, monkeypatch):
+    hasher = appmod.password_hasher
+    monkeypatch.setattr(hasher, 'workers', 1)
+    monkeypatch.setattr(hasher, 'max_pending', 2)
+    try:
+        login(app)
+        assert hasher.pool is not None and hasher.pending == 0
+        assert stored_hash(app).startswith('pbkdf2:sha256:1000$')
+        assert 'password_hash_seconds_count{op="verify"}' in hasher.render()
+    finally:
+        if hasher.pool is not None:
+            hasher.pool.shutdown()
+            hasher.pool = None
+
+@pytest.mark.parametrize('method, normalized', [
+    ('scrypt', 'scrypt:32768:8:1'),
+    ('pbkdf2', f'pbkdf2:sha256:{appmod.DEFAULT_PBKDF2_ITERATIONS}'),
+    ('pbkdf2:sha512', f'pbkdf2:sha512:{appmod.DEFAULT_PBKDF2_ITERATIONS}'),
+    ('pbkdf2:sha256:1000', 'pbkdf2:sha256:1000'),
+])
+def test_hash_method_is_spelled_out(method, normalized):
+    assert appmod.normalize_hash_method(method) == normalized
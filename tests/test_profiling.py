@@ -0,0 +1,61 @@
+import os
+import pstats
+
+import pytest
+
+import app as appmod
+
+@pytest.fixture
+def profiles(app, tmp_path):
+    app.config.update(PROFILE_DIR=str(tmp_path / 'profiles'), PROFILE_SAMPLE_RATE=1.0, PROFILE_INTERVAL_MS=1)
+    return tmp_path / 'profiles'
+
+def written(directory):
+    return sorted(os.listdir(directory)) if directory.exists() else []
+
+def test_sampled_endpoints_are_profiled(app, client, profiles):
+    app.config['PROFILE_ENDPOINTS'] = 'api_data, reports.api_reports'
+    client.get('/api/data')
+    client.get('/api/reports')
+    client.get('/api/goals')
+    names = written(profiles)
+    assert [n.split('-')[1] for n in names] == ['habits.api_data'] * 2 + ['reports.api_reports'] * 2
+    assert {os.path.splitext(n)[1] for n in names} == {'.pstats', '.collapsed'}
+    stats = pstats.Stats(str(profiles / next(n for n in names if n.endswith('.pstats'))))
+    assert any(func == 'api_data' for _, _, func in stats.stats)
+
+def test_sample_rate_zero_profiles_nothing(app, client, profiles):
+    app.config.update(PROFILE_ENDPOINTS='api_data', PROFILE_SAMPLE_RATE=0.0)
+    client.get('/api/data')
+    assert written(profiles) == []
+
+def test_token_profiles_any_request(app, client, profiles):
+    app.config.update(PROFILE_TOKEN='secret', PROFILE_FORMAT='pstats')
+    client.get('/api/goals', headers={'X-Profile': 'wrong'})
+    assert written(profiles) == []
+    client.get('/api/goals', headers={'X-Profile': 'secret'})
+    assert [n.split('-')[1] for n in written(profiles)] == ['reports.api_goals']
+    assert written(profiles)[0].endswith('ms.pstats')
+
+def test_streamed_response_is_profiled_until_closed(app, client, profiles):
+    app.config.update(PROFILE_ENDPOINTS='export_csv', PROFILE_FORMAT='collapsed')
+    resp = client.get('/export/csv')
+    assert resp.status_code == 200
+    resp.get_data()
+    resp.close()
+    assert [n.split('-')[1] for n in written(profiles)] == ['export.export_csv']
+
+def test_only_newest_profiles_are_kept(app, client, profiles):
+    app.config.update(PROFILE_ENDPOINTS='api_data', PROFILE_KEEP=2)
+    for _ in range(4):
+        client.get('/api/data')
+    assert len(written(profiles)) == 4  # two pstats/collapsed pairs
+
+def test_prune_profiles(tmp_path):
+    for stem in ('20240101T000000000000-a-1ms', '20240102T000000000000-b-1ms', '20240103T000000000000-c-1ms'):
+        (tmp_path / f'{stem}.pstats').write_text('')
+        (tmp_path / f'{stem}.collapsed').write_text('')
+    (tmp_path / 'notes.txt').write_text('')
+    appmod.prune_profiles(str(tmp_path), 1)
+    assert sorted(os.listdir(tmp_path)) == ['20240103T000000000000-c-1ms.collapsed',
+                                            '20240103T000000000000-c-1ms.pstats', 'notes.txt']
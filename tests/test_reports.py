@@ -0,0 +1,121 @@
+import pytest
+
+import app as appmod
+from conftest import add_habit
+
+MONTH = {'period': 'month', 'start': '2024-03-15'}
+
+@pytest.fixture
+def habits(client):
+    ids = {
+        'run': add_habit(client, name='Run', tags=['health'], monthlyGoal=4),
+        'read': add_habit(client, name='read', tags=['study'], monthlyGoal=10),
+        'water': add_habit(client, name='Water', kind='numeric', tags=['health', 'study']),
+    }
+    for d in ('2024-02-29', '2024-03-01', '2024-03-02', '2024-03-03', '2024-03-20', '2024-04-01'):
+        client.post('/api/toggle', json={'id': ids['run'], 'date': d})
+    client.post('/api/toggle', json={'id': ids['run'], 'date': '2024-03-03'})  # undone, still a row
+    for d in ('2024-03-02', '2024-03-10'):
+        client.post('/api/toggle', json={'id': ids['read'], 'date': d})
+    for d, v in (('2024-03-05', 2.5), ('2024-03-06', 0), ('2024-03-31', 1)):
+        client.post('/api/numeric/set', json={'id': ids['water'], 'date': d, 'value': v})
+    for d, text, rating, tags, category in (('2024-03-02', 'Walk', 4, ['health'], 'Outdoor'),
+                                            ('2024-03-02', 'Book', None, ['study'], None),
+                                            ('2024-03-09', 'Swim', 5, ['health', 'study'], 'outdoor'),
+                                            ('2024-04-09', 'Later', 3, [], None)):
+        client.post('/api/media/add', json={'date': d, 'text': text, 'rating': rating, 'tags': tags,
+                                            'category': category})
+    return ids
+
+def report(client, **args):
+    resp = client.get('/api/reports', query_string=dict(MONTH, **args))
+    assert resp.status_code == 200, resp.get_json()
+    return resp.get_json()
+
+@pytest.mark.parametrize('history_store', [True, False], ids=['bitmaps', 'range_queries'])
+def test_summary_and_goals(client, habits, monkeypatch, history_store):
+    monkeypatch.setattr(appmod.history_store, 'enabled', history_store)
+    loads = appmod.history_store.loads
+    data = report(client)
+    assert appmod.history_store.loads == loads + history_store  # no full history scan without the store
+    assert (data['start'], data['end'], data['goalsMonth']) == ('2024-03-01', '2024-03-31', '2024-03')
+    # Run 4 rows, read 2, Water 3, journal 3
+    assert data['count'] == 12
+    summary = {s['habit']: (s['count'], s['sum']) for s in data['summary']}
+    assert summary == {'Run': (3, 0.0), 'read': (2, 0.0), 'Water': (2, 3.5)}
+    streaks = {s['habit']: (s['currentStreak'], s['bestStreak']) for s in data['summary']}
+    assert streaks == {'Run': (0, 3), 'read': (0, 1), 'Water': (0, 1)}
+    goals = {g['habit']: (g['doneCount'], g['percent']) for g in data['goals']}
+    assert goals == {'Run': (3, 75.0), 'read': (2, 20.0)}
+    assert client.get('/api/goals?month=2024-03').get_json()['goals'][0]['doneCount'] == 3
+
+@pytest.mark.parametrize('tag, mode, habits_in, count', [
+    ('health', 'any', ['Run', 'Water'], 4 + 3 + 2),
+    ('health,study', 'any', ['Run', 'read', 'Water'], 12),
+    ('health,study', 'all', ['Water'], 3 + 1),
+    ('HEALTH', 'any', ['Run', 'Water'], 9),
+    ('nope', 'any', [], 0),
+])
+def test_tag_filters(client, habits, tag, mode, habits_in, count):
+    data = report(client, tag=tag, tag_mode=mode)
+    assert [s['habit'] for s in data['summary']] == habits_in
+    assert data['count'] == count
+
+@pytest.mark.parametrize('sort', ['date', 'habit', 'category', 'rating'])
+@pytest.mark.parametrize('row_type', [None, 'habit', 'journal'])
+def test_row_pages_concatenate_to_one_page(client, habits, sort, row_type):
+    args = dict(MONTH, sort=sort, **({'type': row_type} if row_type else {}))
+    whole = client.get('/api/reports/rows', query_string=dict(args, limit=500)).get_json()
+    assert whole['nextCursor'] is None
+    rows, cursor = [], None
+    while True:
+        page = client.get('/api/reports/rows', query_string=dict(args, limit=2, **({'cursor': cursor} if cursor else {})))
+        assert page.status_code == 200, page.get_json()
+        rows += page.get_json()['rows']
+        cursor = page.get_json()['nextCursor']
+        if cursor is None:
+            break
+    assert rows == whole['rows']
+    assert len(rows) == {None: 12, 'habit': 9, 'journal': 3}[row_type]
+
+def test_rows_in_sort_order(client, habits):
+    rows = client.get('/api/reports/rows', query_string=dict(MONTH, sort='rating', type='journal')).get_json()['rows']
+    assert [r['text'] for r in rows] == ['Swim', 'Walk', 'Book']
+    rows = client.get('/api/reports/rows', query_string=dict(MONTH, sort='habit', type='habit')).get_json()['rows']
+    assert [r['habit'] for r in rows] == ['read'] * 2 + ['Run'] * 4 + ['Water'] * 3
+
+@pytest.mark.parametrize('url', [
+    '/api/reports?tag_mode=some',
+    '/api/reports/rows?sort=mood',
+    '/api/reports/rows?type=goal',
+    '/api/reports/rows?cursor=bogus',
+    '/api/goals?month=2024-13',
+])
+def test_invalid_parameters(client, url):
+    assert client.get(url).status_code == 400
+
+def test_cursor_of_another_sort_is_rejected(client, habits):
+    cursor = client.get('/api/reports/rows', query_string=dict(MONTH, limit=1)).get_json()['nextCursor']
+    resp = client.get('/api/reports/rows', query_string=dict(MONTH, sort='habit', cursor=cursor))
+    assert resp.status_code == 400
+
+@pytest.mark.parametrize('key', [
+    ['date', '739000', 'run', 0, 1, 1],       # day as a string
+    ['date', 739000, 5, 0, 1, 1],             # name as an int
+    ['habit', 'run', '739000', 0, 1, 1],
+    ['category', 'x', 739000, 0, '1', 1],     # id as a string
+    ['rating', True, 0, 0, 1, 1],             # bools are not ints
+    ['rating', 0, 0, 0, 1],                   # too short
+    ['rating', 0, 0, 0, 1, 1, 1],             # too long
+    ['rating', 0, 0, 0, 1, 2 ** 80],          # beyond the id column
+    ['rating', 0, None, 0, 1, 1],
+])
+def test_cursor_values_must_match_the_sort_key(client, habits, key):
+    resp = client.get('/api/reports/rows', query_string=dict(MONTH, sort=key[0], cursor=appmod.encode_cursor(*key)))
+    assert resp.status_code == 400, resp.get_json()
+
+def test_crafted_cursor_of_the_right_shape_pages_on(client, habits):
+    cursor = appmod.encode_cursor('habit', 'run', 0, 0, 0, 0)  # after read, before Run's first day
+    resp = client.get('/api/reports/rows', query_string=dict(MONTH, sort='habit', cursor=cursor))
+    assert resp.status_code == 200
+    assert {r['habit'] for r in resp.get_json()['rows'] if r['type'] == 'habit'} == {'Run', 'Water'}
@@ -0,0 +1,120 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+import app as appmod
+from conftest import add_habit, rollup_rows
+
+def day(n):
+    return (date.today() - timedelta(days=n)).isoformat()
+
+def derived_rows():
+    # Everything rebuild_rollup recreates: rollup, streak index and goal progress
+    s = appmod.db.session
+    return (rollup_rows(),
+            sorted(tuple(r) for r in s.query(appmod.StreakRun.habit_id, appmod.StreakRun.start_day,
+                                             appmod.StreakRun.end_day, appmod.StreakRun.length)),
+            sorted(tuple(r) for r in s.query(appmod.HabitStreak.habit_id, appmod.HabitStreak.best,
+                                             appmod.HabitStreak.last_start, appmod.HabitStreak.last_end)),
+            sorted(tuple(r) for r in s.query(appmod.GoalProgress.habit_id, appmod.GoalProgress.month,
+                                             appmod.GoalProgress.done_days, appmod.GoalProgress.value_total)))
+
+@pytest.fixture
+def habits(client):
+    return {
+        'check': add_habit(client, name='Run', monthlyGoal=10),
+        'single': add_habit(client, name='Water', kind='numeric', unit='l', dailyGoal=2),
+        'multi': add_habit(client, name='Pages', kind='numeric', allowMulti=True, monthlyGoal=5),
+    }
+
+def write_history(client, habits):
+    check, single, multi = habits['check'], habits['single'], habits['multi']
+    for n in (0, 1, 2, 4, 5, 9, 40):
+        client.post('/api/toggle', json={'id': check, 'date': day(n)})
+    client.post('/api/toggle', json={'id': check, 'date': day(4)})  # undone again
+    client.post('/api/clear', json={'id': check, 'date': day(9)})
+    client.post('/api/habit/delete-value', json={'habit_id': check, 'date': day(40)})
+    for n, v in ((0, 1.5), (1, 2), (3, 0.5), (6, 0)):
+        client.post('/api/numeric/set', json={'id': single, 'date': day(n), 'value': v})
+    client.post('/api/numeric/clear', json={'id': single, 'date': day(3)})
+    for n, v in ((0, 10), (0, 5), (2, 7), (8, 3)):
+        client.post('/api/numeric/set', json={'id': multi, 'date': day(n), 'value': v})
+    client.post('/api/numeric/clear', json={'id': multi, 'date': day(8)})
+    client.post('/api/media/add', json={'date': day(1), 'text': 'read', 'rating': 4})
+    resp = client.post('/api/batch', json={'ops': [
+        {'op': 'toggle', 'id': check, 'date': day(3)},
+        {'op': 'toggle', 'id': check, 'date': day(0)},
+        {'op': 'set', 'id': single, 'date': day(7), 'value': 3},
+        {'op': 'set', 'id': multi, 'date': day(7), 'value': 1},
+        {'op': 'numeric_clear', 'id': single, 'date': day(1)},
+        {'op': 'media_add', 'date': day(2), 'text': 'walk'},
+        {'op': 'set', 'id': check, 'date': day(2), 'value': 1},
+    ]})
+    assert [r['ok'] for r in resp.get_json()['results']] == [True] * 6 + [False]
+
+def test_writes_keep_rollup_equal_to_rebuild(app, client, habits):
+    write_history(client, habits)
+    with app.app_context():
+        maintained = derived_rows()
+        assert appmod.verify_streaks() == []
+        appmod.rebuild_rollup()
+        assert derived_rows() == maintained
+
+def test_windowed_streak_runs_match_python(app, client, habits):
+    write_history(client, habits)
+    with app.app_context():
+        user = appmod.User.query.one()
+        rows = appmod.Habit.query.filter_by(user_id=user.id).all()
+        by_key = lambda r: (r['habit_id'], r.get('start_day'))
+        windowed, python = (appmod._streak_runs_windowed(user.id, rows), appmod._streak_runs_python(user.id, rows))
+        assert [sorted(x, key=by_key) for x in windowed] == [sorted(x, key=by_key) for x in python]
+        assert windowed[0]
+
+def test_streaks_from_api(client, habits):
+    write_history(client, habits)
+    summary = {s['habit']: s for s in client.get('/api/reports?period=year').get_json()['summary']}
+    # Run: done on days 0 and 4 flipped by the batch and toggle, leaving 1, 2, 3, 5
+    assert (summary['Run']['currentStreak'], summary['Run']['bestStreak']) == (0, 3)
+    assert (summary['Pages']['currentStreak'], summary['Pages']['bestStreak']) == (1, 1)
+
+@pytest.mark.parametrize('delete', [
+    lambda client, hid: client.post('/api/habits/delete', json={'id': hid}),
+    lambda client, hid: client.delete(f'/api/delete_habit/{hid}'),
+], ids=['api_habits_delete', 'api_delete_habit'])
+def test_deleting_a_habit_removes_its_rows(app, client, habits, delete):
+    write_history(client, habits)
+    for hid in habits.values():
+        assert delete(client, hid).status_code == 200
+    assert delete(client, habits['check']).status_code == 404
+    with app.app_context():
+        for model in (appmod.Habit, appmod.Record, appmod.NumericEntry, appmod.HabitTag,
+                      appmod.StreakRun, appmod.HabitStreak, appmod.GoalProgress):
+            assert model.query.count() == 0, model.__name__
+        assert {r[1] for r in rollup_rows()} == {appmod.JOURNAL_HABIT_ID}
+
+def test_recreated_habit_does_not_inherit_history(client):
+    old = add_habit(client, name='Old')
+    for n in range(5):
+        client.post('/api/toggle', json={'id': old, 'date': day(n)})
+    assert client.get('/api/reports?period=year').get_json()['summary'][0]['bestStreak'] == 5
+    client.post('/api/habits/delete', json={'id': old})
+    add_habit(client, name='New')  # same id on SQLite
+    summary = client.get('/api/reports?period=year').get_json()['summary']
+    assert [(s['habit'], s['count'], s['currentStreak'], s['bestStreak']) for s in summary] == [('New', 0, 0, 0)]
+
+def test_batches_keep_rollup_equal_to_rebuild(app, client, habits):
+    rng = random.Random(7)
+    write_history(client, habits)
+    for _ in range(6):
+        ops = []
+        for _ in range(rng.randrange(1, 60)):
+            op, key = rng.choice([('toggle', 'check'), ('clear', 'check'), ('set', 'single'), ('set', 'multi'),
+                                  ('numeric_clear', 'single'), ('numeric_clear', 'multi'), ('clear', 'single')])
+            ops.append({'op': op, 'id': habits[key], 'date': day(rng.randrange(45)), 'value': rng.choice([0, 1, 2.5])})
+        assert client.post('/api/batch', json={'ops': ops}).get_json()['ok']
+    with app.app_context():
+        maintained = derived_rows()
+        assert appmod.verify_streaks() == []
+        appmod.rebuild_rollup()
+        assert derived_rows() == maintained
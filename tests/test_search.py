@@ -0,0 +1,99 @@
+import pytest
+
+import app as appmod
+from conftest import login
+
+ENTRIES = [
+    ('2024-03-01', 'Walk in the park', 'walk', None, ['health']),
+    ('2024-03-02', 'Long walk home after a slow evening of reading', None, None, ['health', 'study']),
+    ('2024-03-03', 'Café visit', 'Food', 'https://example.com/walking-tour', []),
+    ('2024-03-04', 'Reading club', 'Books', None, ['study']),
+    ('2024-03-05', 'Running late, walked instead', None, None, ['HEALTH']),
+]
+
+@pytest.fixture
+def entries(app, client):
+    with app.app_context():
+        if not appmod.search_available():
+            pytest.skip('journal search needs SQLite with FTS5')
+    ids = {}
+    for d, text, category, link, tags in ENTRIES:
+        resp = client.post('/api/media/add', json={'date': d, 'text': text, 'category': category,
+                                                   'link': link, 'tags': tags})
+        ids[text] = resp.get_json()['id']
+    return ids
+
+def search(client, q, **args):
+    resp = client.get('/api/media/search', query_string=dict(args, q=q))
+    assert resp.status_code == 200, resp.get_json()
+    return resp.get_json()
+
+def texts(client, q, **args):
+    return [r['text'] for r in search(client, q, **args)['results']]
+
+def test_matches_words_and_prefixes(client, entries):
+    # 'walk' is a prefix of walked and walking; a category match counts most, a link match least
+    assert texts(client, 'walk') == ['Walk in the park', 'Running late, walked instead',
+                                     'Long walk home after a slow evening of reading', 'Café visit']
+    assert texts(client, 'walk reading') == ['Long walk home after a slow evening of reading']
+    assert texts(client, 'cafe') == ['Café visit']
+    assert texts(client, 'swim') == []
+    result = search(client, 'club')['results'][0]
+    assert result['id'] == entries['Reading club'] and result['tags'] == ['study'] and result['score'] > 0
+
+def test_index_follows_updates_and_deletes(client, entries):
+    client.post('/api/media/update', json={'id': entries['Reading club'], 'text': 'Chess club'})
+    client.post('/api/media/delete', json={'id': entries['Walk in the park']})
+    assert texts(client, 'chess') == ['Chess club']
+    assert 'Reading club' not in texts(client, 'reading')
+    assert 'Walk in the park' not in texts(client, 'park walk')
+
+def test_only_own_entries(app, client, entries):
+    other = login(app, email='b@example.com')
+    other.post('/api/media/add', json={'date': '2024-03-01', 'text': 'Walk the dog'})
+    assert 'Walk the dog' not in texts(client, 'walk')
+    assert texts(other, 'walk') == ['Walk the dog']
+
+@pytest.mark.parametrize('args, expected', [
+    ({'start': '2024-03-02', 'end': '2024-03-04'}, {'Long walk home after a slow evening of reading', 'Café visit'}),
+    ({'tag': 'health'}, {'Walk in the park', 'Long walk home after a slow evening of reading',
+                         'Running late, walked instead'}),
+    ({'tag': 'health,study', 'tag_mode': 'all'}, {'Long walk home after a slow evening of reading'}),
+])
+def test_filters(client, entries, args, expected):
+    assert set(texts(client, 'walk', **args)) == expected
+
+@pytest.mark.parametrize('sort', ['rank', 'date'])
+def test_pages_concatenate_to_one_page(client, entries, sort):
+    whole = search(client, 'walk', sort=sort, limit=100)
+    assert whole['nextCursor'] is None
+    rows, cursor = [], None
+    while True:
+        page = search(client, 'walk', sort=sort, limit=1, **({'cursor': cursor} if cursor else {}))
+        rows += page['results']
+        cursor = page['nextCursor']
+        if cursor is None:
+            break
+    assert rows == whole['results'] and len(rows) == 4
+    if sort == 'date':
+        assert [r['date'] for r in rows] == ['2024-03-05', '2024-03-03', '2024-03-02', '2024-03-01']
+
+@pytest.mark.parametrize('query', [
+    '',
+    '?q=',
+    '?q=%22*',
+    '?q=walk&sort=best',
+    '?q=walk&tag_mode=some',
+    '?q=walk&start=2024-02-30',
+    '?q=walk&cursor=bogus',
+    '?q=walk&sort=date&cursor=' + appmod.encode_cursor(1.5, 1),
+    '?q=walk&cursor=' + appmod.encode_cursor('2024-03-01', 1),
+])
+def test_invalid_parameters(client, query):
+    assert client.get('/api/media/search' + query).status_code == 400
+
+def test_unavailable_without_fts5(app, client):
+    with app.app_context():
+        if appmod.search_available():
+            pytest.skip('search is available on this backend')
+    assert client.get('/api/media/search?q=walk').status_code == 501
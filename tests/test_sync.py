@@ -0,0 +1,122 @@
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import text
+
+import app as appmod
+from conftest import add_habit, login
+
+def apply_sync(habits, delta):
+    # What a client does with /api/sync: merge habits and days into its /api/data copy
+    assert delta['full'] is False
+    by_id = {h['id']: h for h in habits}
+    for h in delta['habits']:
+        by_id[h['id']] = dict(h, records=by_id.get(h['id'], {}).get('records', {}))
+    for d in delta['days']:
+        records = by_id[d['habitId']]['records']
+        if d['value'] is None:
+            records.pop(d['date'], None)
+        else:
+            records[d['date']] = d['value']
+    for hid in delta['deleted']['habits']:
+        by_id.pop(hid, None)
+    return [by_id[hid] for hid in sorted(by_id)]
+
+def data_version(app, email='a@example.com'):
+    with app.app_context():
+        return appmod.User.query.filter_by(email=email).one().data_version
+
+def test_sync_replays_writes_since_snapshot(client):
+    run = add_habit(client, name='Run', tags=['health'])
+    gone = add_habit(client, name='Gone')
+    client.post('/api/toggle', json={'id': run, 'date': '2024-01-01'})
+    client.post('/api/toggle', json={'id': gone, 'date': '2024-01-01'})
+    snapshot = client.get('/api/data').get_json()
+
+    water = add_habit(client, name='Water', kind='numeric', allowMulti=True)
+    client.post('/api/toggle', json={'id': run, 'date': '2024-01-01'})
+    client.post('/api/toggle', json={'id': run, 'date': '2024-01-02'})
+    client.post('/api/clear', json={'id': run, 'date': '2024-01-02'})
+    client.post('/api/numeric/set', json={'id': water, 'date': '2024-01-02', 'value': 1.5})
+    client.post('/api/habits/tags', json={'id': run, 'tags': ['health', 'cardio']})
+    client.post('/api/habits/delete', json={'id': gone})
+    entry = client.post('/api/media/add', json={'date': '2024-01-02', 'text': 'walk'}).get_json()['id']
+    dropped = client.post('/api/media/add', json={'date': '2024-01-02', 'text': 'typo'}).get_json()['id']
+    client.post('/api/media/delete', json={'id': dropped})
+
+    delta = client.get(f"/api/sync?since={snapshot['cursor']}").get_json()
+    fresh = client.get('/api/data').get_json()
+    assert apply_sync(snapshot['habits'], delta) == fresh['habits']
+    assert [e['id'] for e in delta['mediaEntries']] == [entry]
+    assert delta['deleted'] == {'habits': [gone], 'mediaEntries': [dropped]}
+
+    again = client.get(f"/api/sync?since={delta['cursor']}").get_json()
+    assert (again['habits'], again['days'], again['mediaEntries']) == ([], [], [])
+
+def test_sync_is_per_user(app, client):
+    cursor = client.get('/api/data').get_json()['cursor']
+    other = login(app, email='b@example.com')
+    add_habit(other, name='Theirs')
+    delta = client.get(f'/api/sync?since={cursor}').get_json()
+    assert delta['habits'] == [] and delta['days'] == []
+
+@pytest.mark.parametrize('query', ['', '?since=-1', '?since=999999999999', '?since=abc'])
+def test_sync_without_usable_cursor_asks_for_full_reload(client, query):
+    add_habit(client)
+    resp = client.get('/api/sync' + query).get_json()
+    assert resp['full'] is True and isinstance(resp['cursor'], int)
+
+def test_sync_waits_for_open_transactions(app, client):
+    hid = add_habit(client)
+    cursor = client.get('/api/data').get_json()['cursor']
+    with app.app_context():
+        if appmod.db.engine.dialect.name != 'postgresql':
+            pytest.skip('SQLite runs one write transaction at a time')
+        # An earlier transaction that commits after a later one
+        slow = appmod.db.engine.connect()
+        slow.begin()
+        slow.execute(text("INSERT INTO record (habit_id, date, done) VALUES (:hid, :day, true)"),
+                     {'hid': hid, 'day': date(2024, 1, 1).toordinal()})
+    try:
+        client.post('/api/toggle', json={'id': hid, 'date': '2024-01-02'})
+        first = client.get(f'/api/sync?since={cursor}').get_json()
+        assert first['days'] == []  # held back below the open transaction
+    finally:
+        slow.commit()
+        slow.close()
+    second = client.get(f"/api/sync?since={first['cursor']}").get_json()
+    assert sorted(d['date'] for d in second['days']) == ['2024-01-01', '2024-01-02']
+
+def test_data_version_bumps_once_per_changing_write(app, client):
+    hid = add_habit(client)
+    version = data_version(app)
+    client.post('/api/toggle', json={'id': hid, 'date': '2024-01-01'})
+    assert data_version(app) == version + 1
+    client.post('/api/batch', json={'ops': [{'op': 'toggle', 'id': hid, 'date': d}
+                                            for d in ('2024-01-02', '2024-01-03')]})
+    assert data_version(app) == version + 2
+    # Requests that change nothing keep cached responses valid
+    client.post('/api/clear', json={'id': hid, 'date': '2023-12-31'})
+    client.post('/api/batch', json={'ops': []})
+    client.post('/api/login', json={'email': 'a@example.com', 'password': 'pw'})
+    client.get('/api/data')
+    assert data_version(app) == version + 2
+
+def test_pruned_cursors_get_full_reload(app, client):
+    hid = add_habit(client)
+    client.post('/api/toggle', json={'id': hid, 'date': '2024-01-01'})
+    old = client.get('/api/data').get_json()['cursor']
+    client.post('/api/toggle', json={'id': hid, 'date': '2024-01-02'})
+    recent = client.get('/api/data').get_json()['cursor']
+    client.post('/api/toggle', json={'id': hid, 'date': '2024-01-03'})
+    with app.app_context():
+        # Everything but the last toggle is past the retention window
+        last = appmod.db.session.query(appmod.func.max(appmod.ChangeLog.seq)).scalar()
+        appmod.ChangeLog.query.filter(appmod.ChangeLog.seq < last).update({'changed_at': datetime(2000, 1, 1)})
+        appmod.db.session.commit()
+    result = app.test_cli_runner().invoke(args=['prune-changes', '--days', '1'])
+    assert result.exit_code == 0 and 'Pruned' in result.output
+
+    assert client.get(f'/api/sync?since={old}').get_json()['full'] is True
+    delta = client.get(f'/api/sync?since={recent}').get_json()
+    assert [d['date'] for d in delta['days']] == ['2024-01-03']